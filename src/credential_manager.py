@@ -662,12 +662,8 @@ class CredentialManager:
             # 解析过期时间
             try:
                 if isinstance(expiry_str, str):
-                    if "+" in expiry_str:
-                        file_expiry = datetime.fromisoformat(expiry_str)
-                    elif expiry_str.endswith("Z"):
-                        file_expiry = datetime.fromisoformat(expiry_str.replace("Z", "+00:00"))
-                    else:
-                        file_expiry = datetime.fromisoformat(expiry_str)
+                    # fromisoformat 可直接解析 "Z" 和任意时区偏移，只需解析一次
+                    file_expiry = datetime.fromisoformat(expiry_str)
                 else:
                     log.debug("过期时间格式无效，需要刷新")
                     return True
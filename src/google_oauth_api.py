@@ -204,12 +204,10 @@ class Credentials:
             try:
                 expiry_str = data["expiry"]
                 if isinstance(expiry_str, str):
-                    if expiry_str.endswith("Z"):
-                        expires_at = datetime.fromisoformat(expiry_str.replace("Z", "+00:00"))
-                    elif "+" in expiry_str:
-                        expires_at = datetime.fromisoformat(expiry_str)
-                    else:
-                        expires_at = datetime.fromisoformat(expiry_str).replace(tzinfo=timezone.utc)
+                    # fromisoformat 可直接解析 "Z" 和任意时区偏移，只需解析一次
+                    expires_at = datetime.fromisoformat(expiry_str)
+                    if expires_at.tzinfo is None:
+                        expires_at = expires_at.replace(tzinfo=timezone.utc)
             except ValueError:
                 log.warning(f"无法解析过期时间: {expiry_str}")
 
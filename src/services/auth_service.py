@@ -387,8 +387,7 @@ class AuthService:
             if key.startswith("GCLI_CREDS_"):
                 try:
                     cred_name = key.replace("GCLI_CREDS_", "")
-                    cred_data = json.loads(value)
-                    env_creds[cred_name] = cred_data
+                    env_creds[f"env-{cred_name}.json"] = json.loads(value)
                 except Exception as e:
                     log.error(f"Failed to parse env cred {key}: {e}")
 
@@ -396,10 +395,8 @@ class AuthService:
             return
 
         storage_adapter = await get_storage_adapter()
-        for name, data in env_creds.items():
-            filename = f"env-{name}.json"
-            await storage_adapter.store_credential(filename, data)
-            log.info(f"Loaded env credential: {filename}")
+        await storage_adapter.store_credentials_bulk(env_creds)
+        log.info(f"Loaded {len(env_creds)} env credentials: {', '.join(env_creds)}")
 
 # Global instance getter
 auth_service = AuthService.get_instance()
@@ -7,7 +7,7 @@ from log import log
 class ConnectionManager:
     def __init__(self, max_connections: int = 3):  # 进一步降低最大连接数
         # 使用双端队列严格限制内存使用
-        self.active_connections: deque = deque(maxlen=max_connections)
+        self.active_connections: deque[WebSocket] = deque(maxlen=max_connections)
         self.max_connections = max_connections
         self._last_cleanup = 0
         self._cleanup_interval = 120  # 120秒清理一次死连接
@@ -68,8 +68,7 @@ class ConnectionManager:
             [
                 conn
                 for conn in self.active_connections
-                if hasattr(conn, "client_state")
-                and conn.client_state != WebSocketState.DISCONNECTED
+                if conn.client_state != WebSocketState.DISCONNECTED
             ],
             maxlen=self.max_connections,
         )
@@ -15,6 +15,19 @@ from src.openai_transfer import _extract_content_and_reasoning
 from src.anti_truncation import apply_anti_truncation_to_stream
 from log import log
 
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
+
 class GeminiService:
     _instance = None
     
@@ -85,7 +98,7 @@ class GeminiService:
             if is_stream:
                 if use_fake_streaming:
                     # 假流式：获取全量响应，切分转换
-                    response_data = await response.json()
+                    response_data = _json_loads(await response.aread())
                     return self._handle_fake_streaming(response_data)
                 elif use_anti_truncation:
                     # 防截断流式
@@ -101,7 +114,7 @@ class GeminiService:
                     return self._handle_normal_streaming(response)
             else:
                 # 非流式直接返回 JSON
-                return await response.json()
+                return _json_loads(await response.aread())
 
         except Exception as e:
             log.error(f"GeminiService Error: {e}")
@@ -126,7 +139,7 @@ class GeminiService:
         for i in range(0, len(full_text), chunk_size):
             chunk_text = full_text[i : i + chunk_size]
             chunk = create_gemini_stream_chunk(chunk_text)
-            yield f"data: {json.dumps(chunk)}\n\n"
+            yield f"data: {_json_dumps(chunk)}\n\n"
             await asyncio.sleep(0.01)
             
         # End
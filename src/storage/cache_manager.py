@@ -7,7 +7,7 @@ import asyncio
 import time
 from abc import ABC, abstractmethod
 from collections import deque
-from typing import Any, Dict, Optional
+from typing import AbstractSet, Any, Dict, Optional, Set
 
 from log import log
 
@@ -25,6 +25,24 @@ class CacheBackend(ABC):
         """将数据写入底层存储"""
         pass
 
+    async def write_changes(self, data: Dict[str, Any], changed_keys: AbstractSet[str]) -> bool:
+        """将数据写入底层存储，changed_keys 为上次成功写入以来修改或删除过的键
+        默认忽略 changed_keys 整体写入；后端可据此只重新序列化变更的数据项
+        """
+        return await self.write_data(data)
+
+    async def patch_key(self, key: str, value: Any) -> bool:
+        """仅将单个数据项写入底层存储，返回False表示不支持或失败（由调用方整体写回）"""
+        return False
+
+    async def delete_key(self, key: str) -> bool:
+        """仅从底层存储删除单个数据项，返回False表示不支持或失败（由调用方整体写回）"""
+        return False
+
+    async def load_key(self, key: str) -> Any:
+        """仅从底层存储读取单个数据项，不存在时返回None；无法单独读取时抛出NotImplementedError"""
+        raise NotImplementedError
+
 
 class UnifiedCacheManager:
     """统一缓存管理器"""
@@ -36,6 +54,7 @@ class UnifiedCacheManager:
         max_write_delay: float = 30.0,
         min_write_interval: float = 5.0,
         name: str = "cache",
+        preload: bool = True,
     ):
         """
         初始化缓存管理器
@@ -46,17 +65,25 @@ class UnifiedCacheManager:
             max_write_delay: 最大写入延迟（秒）,用于延迟写入策略
             min_write_interval: 最小写入间隔（秒）,避免频繁写入
             name: 缓存名称（用于日志）
+            preload: 是否在启动时加载全部数据；为False时推迟到首次需要全部数据时加载，
+                在此之前的单项读取尽量通过后端单独读取
         """
         self._backend = cache_backend
         self._write_delay = write_delay
         self._max_write_delay = max_write_delay
         self._min_write_interval = min_write_interval
         self._name = name
+        self._preload = preload
 
         # 缓存数据
         self._cache: Dict[str, Any] = {}
         self._cache_dirty = False
+        self._changed_keys: Set[str] = set()  # 上次成功写回以来修改或删除过的键
         self._cache_loaded = False  # 标记缓存是否已从后端加载
+        self._version = 0  # 缓存内容版本号，每次修改递增
+        self._patch_seq = 0  # 局部写入序号
+        self._key_patch_seq: Dict[str, int] = {}  # 各键进行中的最新局部写入序号
+        self._cold_cache: Dict[str, Any] = {}  # 全量加载前单独读取的数据项
 
         # 并发控制
         self._cache_lock = asyncio.Lock()
@@ -82,7 +109,7 @@ class UnifiedCacheManager:
             return
 
         # 启动时从后端加载一次数据
-        if not self._cache_loaded:
+        if self._preload and not self._cache_loaded:
             await self._load_initial_cache()
 
         self._shutdown_event.clear()
@@ -110,10 +137,19 @@ class UnifiedCacheManager:
             start_time = time.time()
 
             try:
-                # 确保缓存已加载（启动时加载一次，后续不再从后端读取）
                 if not self._cache_loaded:
-                    log.warning(f"{self._name} cache not loaded, loading now")
-                    await self._load_initial_cache()
+                    # 全量加载前优先单独读取该项，避免为一项数据加载全部数据
+                    try:
+                        if key not in self._cold_cache:
+                            self._cold_cache[key] = await self._backend.load_key(key)
+                        result = self._cold_cache[key]
+                        self._operation_count += 1
+                        return default if result is None else result
+                    except NotImplementedError:
+                        pass
+
+                    # 确保缓存已加载（启动时加载一次，后续不再从后端读取）
+                    await self._ensure_loaded()
 
                 # 性能监控
                 self._operation_count += 1
@@ -138,13 +174,13 @@ class UnifiedCacheManager:
 
             try:
                 # 确保缓存已加载（启动时加载一次，后续不再从后端读取）
-                if not self._cache_loaded:
-                    log.warning(f"{self._name} cache not loaded, loading now")
-                    await self._load_initial_cache()
+                await self._ensure_loaded()
 
                 # 更新缓存
                 self._cache[key] = value
+                self._version += 1
                 self._cache_dirty = True
+                self._changed_keys.add(key)
 
                 # 性能监控
                 self._operation_count += 1
@@ -161,6 +197,101 @@ class UnifiedCacheManager:
                 )
                 return False
 
+    async def patch(self, key: str, value: Any) -> bool:
+        """设置缓存项，并直接将该项局部写入后端
+
+        后端不支持局部写入或写入失败时，退回到延迟整体写回。
+        """
+        async with self._cache_lock:
+            start_time = time.time()
+
+            try:
+                # 确保缓存已加载（启动时加载一次，后续不再从后端读取）
+                await self._ensure_loaded()
+
+                self._cache[key] = value
+                self._version += 1
+                self._changed_keys.add(key)
+                seq = self._begin_patch(key)
+            except Exception as e:
+                operation_time = time.time() - start_time
+                log.error(
+                    f"Error patching {self._name} cache key {key} in {operation_time:.3f}s: {e}"
+                )
+                return False
+
+        # 后端写入在锁外进行，避免阻塞其他缓存读写
+        try:
+            patched = await self._backend.patch_key(key, value)
+        except Exception as e:
+            log.error(f"Error patching {self._name} backend key {key}: {e}")
+            patched = False
+
+        operation_time = await self._finish_patch(key, seq, patched, start_time)
+        log.debug(f"{self._name} cache patch: {key} in {operation_time:.3f}s")
+        return True
+
+    async def patch_delete(self, key: str) -> bool:
+        """删除缓存项，并直接从后端删除该项
+
+        后端不支持局部删除或删除失败时，退回到延迟整体写回。
+        """
+        async with self._cache_lock:
+            start_time = time.time()
+
+            try:
+                # 确保缓存已加载（启动时加载一次，后续不再从后端读取）
+                await self._ensure_loaded()
+
+                if key not in self._cache:
+                    log.warning(f"{self._name} cache key not found for deletion: {key}")
+                    return False
+
+                del self._cache[key]
+                self._version += 1
+                self._changed_keys.add(key)
+                seq = self._begin_patch(key)
+            except Exception as e:
+                operation_time = time.time() - start_time
+                log.error(
+                    f"Error deleting {self._name} cache key {key} in {operation_time:.3f}s: {e}"
+                )
+                return False
+
+        # 后端删除在锁外进行，避免阻塞其他缓存读写
+        try:
+            patched = await self._backend.delete_key(key)
+        except Exception as e:
+            log.error(f"Error deleting {self._name} backend key {key}: {e}")
+            patched = False
+
+        operation_time = await self._finish_patch(key, seq, patched, start_time)
+        log.debug(f"{self._name} cache patch delete: {key} in {operation_time:.3f}s")
+        return True
+
+    def _begin_patch(self, key: str) -> int:
+        """登记一次局部写入，返回其序号（需持有缓存锁）"""
+        self._patch_seq += 1
+        self._key_patch_seq[key] = self._patch_seq
+        return self._patch_seq
+
+    async def _finish_patch(self, key: str, seq: int, patched: bool, start_time: float) -> float:
+        """局部写入完成后的处理，返回操作耗时"""
+        async with self._cache_lock:
+            # 写入失败，或期间该项已被再次修改（写入顺序无法保证），交给整体写回
+            if self._key_patch_seq.get(key) == seq:
+                del self._key_patch_seq[key]
+                if not patched:
+                    self._cache_dirty = True
+            else:
+                self._cache_dirty = True
+
+            # 性能监控
+            self._operation_count += 1
+            operation_time = time.time() - start_time
+            self._operation_times.append(operation_time)
+            return operation_time
+
     async def delete(self, key: str) -> bool:
         """删除缓存项"""
         async with self._cache_lock:
@@ -168,13 +299,13 @@ class UnifiedCacheManager:
 
             try:
                 # 确保缓存已加载（启动时加载一次，后续不再从后端读取）
-                if not self._cache_loaded:
-                    log.warning(f"{self._name} cache not loaded, loading now")
-                    await self._load_initial_cache()
+                await self._ensure_loaded()
 
                 if key in self._cache:
                     del self._cache[key]
+                    self._version += 1
                     self._cache_dirty = True
+                    self._changed_keys.add(key)
 
                     # 性能监控
                     self._operation_count += 1
@@ -201,9 +332,7 @@ class UnifiedCacheManager:
 
             try:
                 # 确保缓存已加载（启动时加载一次，后续不再从后端读取）
-                if not self._cache_loaded:
-                    log.warning(f"{self._name} cache not loaded, loading now")
-                    await self._load_initial_cache()
+                await self._ensure_loaded()
 
                 # 性能监控
                 self._operation_count += 1
@@ -220,6 +349,23 @@ class UnifiedCacheManager:
                 log.error(f"Error getting all {self._name} cache in {operation_time:.3f}s: {e}")
                 return {}
 
+    @property
+    def version(self) -> int:
+        """缓存内容版本号，可用于判断基于快照计算的结果是否过期"""
+        return self._version
+
+    async def snapshot(self) -> Dict[str, Any]:
+        """获取缓存数据的引用（不复制）
+
+        仅供只读遍历：调用方不得修改返回的字典，且应在下一次 await 之前完成遍历。
+        """
+        async with self._cache_lock:
+            # 确保缓存已加载（启动时加载一次，后续不再从后端读取）
+            await self._ensure_loaded()
+
+            self._operation_count += 1
+            return self._cache
+
     async def update_multi(self, updates: Dict[str, Any]) -> bool:
         """批量更新缓存项"""
         async with self._cache_lock:
@@ -227,13 +373,13 @@ class UnifiedCacheManager:
 
             try:
                 # 确保缓存已加载（启动时加载一次，后续不再从后端读取）
-                if not self._cache_loaded:
-                    log.warning(f"{self._name} cache not loaded, loading now")
-                    await self._load_initial_cache()
+                await self._ensure_loaded()
 
                 # 批量更新
                 self._cache.update(updates)
+                self._version += 1
                 self._cache_dirty = True
+                self._changed_keys.update(updates)
 
                 # 性能监控
                 self._operation_count += 1
@@ -250,6 +396,14 @@ class UnifiedCacheManager:
                 log.error(f"Error updating {self._name} cache multi in {operation_time:.3f}s: {e}")
                 return False
 
+    async def _ensure_loaded(self):
+        """确保缓存已从后端加载（需持有缓存锁）"""
+        if self._cache_loaded:
+            return
+        if self._preload:
+            log.warning(f"{self._name} cache not loaded, loading now")
+        await self._load_initial_cache()
+
     async def _load_initial_cache(self):
         """
         启动时从底层存储加载初始缓存数据
@@ -268,6 +422,7 @@ class UnifiedCacheManager:
 
             if data:
                 self._cache = data
+                self._version += 1
                 log.info(
                     f"{self._name} cache loaded {len(self._cache)} items from backend "
                     f"(initial load #{self._initial_load_count})"
@@ -275,9 +430,11 @@ class UnifiedCacheManager:
             else:
                 # 如果后端没有数据，初始化空缓存
                 self._cache = {}
+                self._version += 1
                 log.info(f"{self._name} cache initialized empty (backend has no data)")
 
             self._cache_loaded = True
+            self._cold_cache.clear()
             operation_time = time.time() - start_time
             log.info(f"{self._name} initial cache load completed in {operation_time:.3f}s")
 
@@ -285,6 +442,7 @@ class UnifiedCacheManager:
             log.error(f"Error loading {self._name} initial cache from backend: {e}")
             # 加载失败时初始化空缓存，但标记为已加载以避免重复尝试
             self._cache = {}
+            self._version += 1
             self._cache_loaded = True
 
     async def _write_loop(self):
@@ -374,11 +532,15 @@ class UnifiedCacheManager:
         if not self._cache_dirty:
             return
 
+        # 写入失败时保留变更记录，下次一并重写
+        changed_keys = self._changed_keys
+        self._changed_keys = set()
+
         try:
             start_time = time.time()
 
             # 写入后端
-            success = await self._backend.write_data(self._cache.copy())
+            success = await self._backend.write_changes(self._cache.copy(), changed_keys)
 
             if success:
                 self._cache_dirty = False
@@ -393,9 +555,11 @@ class UnifiedCacheManager:
                     f"({len(self._cache)} items, total writes: {self._write_backend_count})"
                 )
             else:
+                self._changed_keys |= changed_keys
                 log.error(f"Failed to write {self._name} cache to backend")
 
         except Exception as e:
+            self._changed_keys |= changed_keys
             log.error(f"Error writing {self._name} cache to backend: {e}")
 
     async def _flush_cache(self):
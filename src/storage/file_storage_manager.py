@@ -304,6 +304,29 @@ class FileStorageManager:
             log.error(f"Error storing credential {filename}: {e}")
             return False
 
+    async def store_credentials_bulk(self, credentials: Dict[str, Dict[str, Any]]) -> bool:
+        """批量存储凭证数据（一次写入）"""
+        self._ensure_initialized()
+
+        try:
+            all_data = await self._credentials_cache_manager.get_all()
+
+            updates = {}
+            for filename, credential_data in credentials.items():
+                filename = self._normalize_filename(filename)
+                final_data = self.get_default_state()
+                final_data.update(all_data.get(filename, {}))
+                final_data.update(credential_data)
+                updates[filename] = final_data
+
+            success = await self._credentials_cache_manager.update_multi(updates)
+            log.debug(f"Stored credentials to unified cache ({len(updates)})")
+            return success
+
+        except Exception as e:
+            log.error(f"Error storing credentials in bulk: {e}")
+            return False
+
     async def get_credential(self, filename: str) -> Optional[Dict[str, Any]]:
         """从统一缓存获取凭证数据"""
         self._ensure_initialized()
@@ -489,6 +512,28 @@ class FileStorageManager:
             log.error(f"Error updating usage stats {filename}: {e}")
             return False
 
+    async def update_usage_stats_bulk(self, stats_by_file: Dict[str, Dict[str, Any]]) -> bool:
+        """批量更新使用统计（一次写入）"""
+        self._ensure_initialized()
+
+        try:
+            all_data = await self._credentials_cache_manager.get_all()
+
+            updates = {}
+            for filename, stats_updates in stats_by_file.items():
+                filename = self._normalize_filename(filename)
+                section_data = all_data.get(filename) or self.get_default_state()
+                section_data.update(stats_updates)
+                updates[filename] = section_data
+
+            success = await self._credentials_cache_manager.update_multi(updates)
+            log.debug(f"Updated usage stats in unified cache ({len(updates)})")
+            return success
+
+        except Exception as e:
+            log.error(f"Error updating usage stats in bulk: {e}")
+            return False
+
     async def get_usage_stats(self, filename: str) -> Dict[str, Any]:
         """从统一缓存获取使用统计"""
         self._ensure_initialized()
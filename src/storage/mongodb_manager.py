@@ -226,6 +226,36 @@ class MongoDBManager:
             log.error(f"Error storing credential {filename} in {operation_time:.3f}s: {e}")
             return False
 
+    async def store_credentials_bulk(self, credentials: Dict[str, Dict[str, Any]]) -> bool:
+        """批量存储凭证数据（合并为一次统一缓存写入）"""
+        self._ensure_initialized()
+        start_time = time.time()
+
+        try:
+            updates = {}
+            for filename, credential_data in credentials.items():
+                existing_data = await self._credentials_cache_manager.get(filename, {})
+                updates[filename] = {
+                    "credential": credential_data,
+                    "state": existing_data.get("state", self._get_default_state()),
+                    "stats": existing_data.get("stats", self._get_default_stats()),
+                }
+
+            success = await self._credentials_cache_manager.update_multi(updates)
+
+            # 性能监控
+            self._operation_count += 1
+            operation_time = time.time() - start_time
+            self._operation_times.append(operation_time)
+
+            log.debug(f"Stored credentials to unified cache ({len(updates)}) in {operation_time:.3f}s")
+            return success
+
+        except Exception as e:
+            operation_time = time.time() - start_time
+            log.error(f"Error storing credentials in bulk in {operation_time:.3f}s: {e}")
+            return False
+
     async def get_credential(self, filename: str) -> Optional[Dict[str, Any]]:
         """从统一缓存获取凭证数据"""
         self._ensure_initialized()
@@ -443,6 +473,43 @@ class MongoDBManager:
             log.error(f"Error updating usage stats {filename} in {operation_time:.3f}s: {e}")
             return False
 
+    async def update_usage_stats_bulk(self, stats_by_file: Dict[str, Dict[str, Any]]) -> bool:
+        """批量更新使用统计（合并为一次统一缓存写入）"""
+        self._ensure_initialized()
+        start_time = time.time()
+
+        try:
+            updates = {}
+            for filename, stats_updates in stats_by_file.items():
+                existing_data = await self._credentials_cache_manager.get(filename, {})
+
+                if not existing_data:
+                    existing_data = {
+                        "credential": {},
+                        "state": self._get_default_state(),
+                        "stats": self._get_default_stats(),
+                    }
+
+                existing_data["stats"].update(stats_updates)
+                updates[filename] = existing_data
+
+            success = await self._credentials_cache_manager.update_multi(updates)
+
+            # 性能监控
+            self._operation_count += 1
+            operation_time = time.time() - start_time
+            self._operation_times.append(operation_time)
+
+            log.debug(
+                f"Updated usage stats in unified cache ({len(updates)}) in {operation_time:.3f}s"
+            )
+            return success
+
+        except Exception as e:
+            operation_time = time.time() - start_time
+            log.error(f"Error updating usage stats in bulk in {operation_time:.3f}s: {e}")
+            return False
+
     async def get_usage_stats(self, filename: str) -> Dict[str, Any]:
         """从统一缓存获取使用统计"""
         self._ensure_initialized()
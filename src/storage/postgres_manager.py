@@ -188,6 +188,22 @@ class PostgresManager:
             log.error(f"Error storing credential {filename} in Postgres: {e}")
             return False
 
+    async def store_credentials_bulk(self, credentials: Dict[str, Dict[str, Any]]) -> bool:
+        self._ensure_initialized()
+        try:
+            updates = {}
+            for filename, credential_data in credentials.items():
+                existing_data = await self._credentials_cache_manager.get(filename, {})
+                updates[filename] = {
+                    "credential": credential_data,
+                    "state": existing_data.get("state", self._get_default_state()),
+                    "stats": existing_data.get("stats", self._get_default_stats()),
+                }
+            return await self._credentials_cache_manager.update_multi(updates)
+        except Exception as e:
+            log.error(f"Error storing credentials in bulk in Postgres: {e}")
+            return False
+
     async def get_credential(self, filename: str) -> Optional[Dict[str, Any]]:
         self._ensure_initialized()
         try:
@@ -288,6 +304,25 @@ class PostgresManager:
             log.error(f"Error updating usage stats for {filename} in Postgres: {e}")
             return False
 
+    async def update_usage_stats_bulk(self, stats_by_file: Dict[str, Dict[str, Any]]) -> bool:
+        self._ensure_initialized()
+        try:
+            updates = {}
+            for filename, stats_updates in stats_by_file.items():
+                existing_data = await self._credentials_cache_manager.get(filename, {})
+                if not existing_data:
+                    existing_data = {
+                        "credential": {},
+                        "state": self._get_default_state(),
+                        "stats": self._get_default_stats(),
+                    }
+                existing_data["stats"].update(stats_updates)
+                updates[filename] = existing_data
+            return await self._credentials_cache_manager.update_multi(updates)
+        except Exception as e:
+            log.error(f"Error updating usage stats in bulk in Postgres: {e}")
+            return False
+
     async def get_usage_stats(self, filename: str) -> Dict[str, Any]:
         self._ensure_initialized()
         try:
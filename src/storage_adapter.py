@@ -195,6 +195,17 @@ class StorageAdapter:
         self._ensure_initialized()
         return await self._backend.store_credential(filename, credential_data)
 
+    async def store_credentials_bulk(self, credentials: Dict[str, Dict[str, Any]]) -> bool:
+        """批量存储凭证数据，后端不支持时逐个存储"""
+        self._ensure_initialized()
+        if hasattr(self._backend, "store_credentials_bulk"):
+            return await self._backend.store_credentials_bulk(credentials)
+
+        success = True
+        for filename, credential_data in credentials.items():
+            success = await self._backend.store_credential(filename, credential_data) and success
+        return success
+
     async def get_credential(self, filename: str) -> Optional[Dict[str, Any]]:
         """获取凭证数据"""
         self._ensure_initialized()
@@ -256,6 +267,17 @@ class StorageAdapter:
         self._ensure_initialized()
         return await self._backend.update_usage_stats(filename, stats_updates)
 
+    async def update_usage_stats_bulk(self, stats_by_file: Dict[str, Dict[str, Any]]) -> bool:
+        """批量更新使用统计，后端不支持时逐个更新"""
+        self._ensure_initialized()
+        if hasattr(self._backend, "update_usage_stats_bulk"):
+            return await self._backend.update_usage_stats_bulk(stats_by_file)
+
+        success = True
+        for filename, stats_updates in stats_by_file.items():
+            success = await self._backend.update_usage_stats(filename, stats_updates) and success
+        return success
+
     async def get_usage_stats(self, filename: str) -> Dict[str, Any]:
         """获取使用统计"""
         self._ensure_initialized()
@@ -3,22 +3,165 @@ Usage statistics module for tracking API calls per credential file.
 Simplified version: only tracks 24h successful call counts.
 """
 
+import asyncio
 import os
 import time
-from datetime import datetime, timedelta, timezone
-from threading import Lock
-from typing import Any, Dict, Optional
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import chain
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+import numpy as np
 
 from config import get_credentials_dir, is_mongodb_mode
 from log import log
 
 from .state_manager import get_state_manager
 from .storage_adapter import get_storage_adapter
+from .task_manager import create_managed_task
+
+
+# Length of the statistics window in seconds
+_WINDOW_SECONDS = 24 * 3600
+
+# Key prefix under which per-user call counts are stored
+_USER_KEY_PREFIX = "USER_stats_"
+
+# Initial capacity of a call timestamp buffer
+_SERIES_INITIAL_CAPACITY = 16
+
+# Latency samples kept per credential file, plenty for a 24h p95 estimate
+_LATENCY_CAPACITY = 10_000
+_LATENCY_INITIAL_CAPACITY = 64
+
+
+def _to_epoch(value: Any) -> Optional[float]:
+    """Convert a stored timestamp (epoch float or legacy ISO string) to epoch seconds."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        dt = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+@lru_cache(maxsize=2)
+def _labels_for_hour(hour: int) -> Tuple[str, ...]:
+    """UTC "HH:00" labels for the 24 hours ending with the given hour (epoch seconds // 3600)."""
+    return tuple(
+        datetime.fromtimestamp((hour - i) * 3600, timezone.utc).strftime("%H:00")
+        for i in range(23, -1, -1)
+    )
+
+
+class _TimeSeries:
+    """
+    Ascending epoch timestamps in one contiguous float64 buffer. Expired entries are
+    dropped by advancing a start offset found with searchsorted; the buffer is only
+    compacted or grown when an append reaches its end.
+    """
+
+    __slots__ = ("buffer", "start", "end")
+
+    def __init__(self, timestamps: Iterable[float] = ()):
+        values = np.fromiter(timestamps, dtype=np.float64)
+        self.buffer = np.empty(max(_SERIES_INITIAL_CAPACITY, 2 * len(values)), dtype=np.float64)
+        self.buffer[:len(values)] = values
+        self.start = 0
+        self.end = len(values)
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def append(self, timestamp: float):
+        # Keep the buffer ascending even if the wall clock steps back
+        if self.end > self.start and timestamp < self.buffer[self.end - 1]:
+            timestamp = self.buffer[self.end - 1]
+        if self.end == len(self.buffer):
+            live = self.end - self.start
+            if live * 2 > len(self.buffer):
+                buffer = np.empty(len(self.buffer) * 2, dtype=np.float64)
+                buffer[:live] = self.buffer[self.start:self.end]
+                self.buffer = buffer
+            else:
+                # At least half the buffer is expired, reuse it
+                self.buffer[:live] = self.buffer[self.start:self.end]
+            self.start = 0
+            self.end = live
+        self.buffer[self.end] = timestamp
+        self.end += 1
+
+    def evict(self, cutoff_time: float) -> int:
+        """Drop timestamps <= cutoff_time, returning how many were removed."""
+        expired = int(np.searchsorted(self.view(), cutoff_time, side="right"))
+        self.start += expired
+        return expired
+
+    def since(self, cutoff_time: float) -> np.ndarray:
+        """View of the timestamps > cutoff_time, without evicting anything."""
+        view = self.view()
+        return view[int(np.searchsorted(view, cutoff_time, side="right")):]
 
+    def view(self) -> np.ndarray:
+        return self.buffer[self.start:self.end]
 
-def _get_24h_ago() -> datetime:
-    """Get the timestamp for 24 hours ago."""
-    return datetime.now(timezone.utc) - timedelta(hours=24)
+    def tolist(self) -> list:
+        return self.view().tolist()
+
+    def clear(self):
+        self.start = self.end = 0
+
+
+class _LatencyRing:
+    """
+    Fixed-capacity ring buffer of (timestamp, latency_ms) samples stored as two
+    parallel arrays. Grows on demand up to _LATENCY_CAPACITY, then overwrites the
+    oldest sample, so no cleanup scan is needed; readers mask by timestamp.
+    """
+
+    __slots__ = ("timestamps", "latencies", "head", "size")
+
+    def __init__(self):
+        self.timestamps = np.empty(_LATENCY_INITIAL_CAPACITY, dtype=np.float64)
+        self.latencies = np.empty(_LATENCY_INITIAL_CAPACITY, dtype=np.float32)
+        self.head = 0  # next slot to write
+        self.size = 0
+
+    def append(self, timestamp: float, latency_ms: float):
+        capacity = len(self.timestamps)
+        if self.size == capacity and capacity < _LATENCY_CAPACITY:
+            # Not wrapped yet, so the samples are contiguous and can simply be copied over
+            capacity = min(capacity * 2, _LATENCY_CAPACITY)
+            self.timestamps = np.resize(self.timestamps, capacity)
+            self.latencies = np.resize(self.latencies, capacity)
+            self.head = self.size
+        self.timestamps[self.head] = timestamp
+        self.latencies[self.head] = latency_ms
+        self.head = (self.head + 1) % capacity
+        if self.size < capacity:
+            self.size += 1
+
+    def since(self, start_time: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Samples with timestamp >= start_time.
+
+        The ring holds at most two time-ordered segments (oldest first), so each is
+        cut with a binary search instead of masking every sample.
+        """
+        if self.size < len(self.timestamps):
+            segments = ((0, self.size),)
+        else:
+            segments = ((self.head, self.size), (0, self.head))
+        timestamp_parts = []
+        latency_parts = []
+        for low, high in segments:
+            first = low + int(np.searchsorted(self.timestamps[low:high], start_time, side="left"))
+            timestamp_parts.append(self.timestamps[first:high])
+            latency_parts.append(self.latencies[first:high])
+        return np.concatenate(timestamp_parts), np.concatenate(latency_parts)
 
 
 class UsageStats:
@@ -28,16 +171,22 @@ class UsageStats:
     """
 
     def __init__(self):
-        self._lock = Lock()
+        self._lock = asyncio.Lock()
         self._state_file = None
         self._state_manager = None
         self._storage_adapter = None
-        self._stats_cache: Dict[str, Dict[str, Any]] = {}
+        # LRU order: most recently used entries are at the end
+        self._stats_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Per-user call timestamps keyed by "USER_stats_{user_id}", kept apart from the
+        # credential file stats so they never enter the trend sweeps; LRU ordered and
+        # bounded by the same size limit
+        self._user_counters: "OrderedDict[str, _TimeSeries]" = OrderedDict()
         self._initialized = False
-        self._cache_dirty = False
+        self._dirty_keys: Set[str] = set()
         self._last_save_time = 0
         self._save_interval = 60  # Save at most once per minute
         self._max_cache_size = 100
+        self._flusher_task: Optional[asyncio.Task] = None
 
     async def initialize(self):
         """Initialize the usage stats module."""
@@ -52,6 +201,8 @@ class UsageStats:
             self._state_manager = get_state_manager(self._state_file)
 
         await self._load_stats()
+        # Changes are persisted by the background flusher, not on the request path
+        self._flusher_task = create_managed_task(self._flush_loop(), name="usage_stats_flusher")
         self._initialized = True
         storage_type = "MongoDB" if await is_mongodb_mode() else "File"
         log.debug(f"Usage statistics module initialized with {storage_type} storage backend")
@@ -72,333 +223,319 @@ class UsageStats:
     async def _load_stats(self):
         """Load statistics from unified storage"""
         try:
-            import asyncio
-
             async def load_stats_with_timeout():
                 all_usage_stats = await self._storage_adapter.get_all_usage_stats()
 
-                stats_cache = {}
+                stats_cache = OrderedDict()
+                user_counters = OrderedDict()
                 processed_count = 0
 
                 for filename, stats_data in all_usage_stats.items():
                     if isinstance(stats_data, dict):
                         normalized_filename = self._normalize_filename(filename)
 
-                        # Only load call_timestamps
-                        usage_data = {
-                            "call_timestamps": stats_data.get("call_timestamps", []),
-                        }
+                        # Only load call_timestamps, converting legacy ISO strings once here
+                        # and keeping them sorted so expired entries are always at the front
+                        timestamps = sorted(
+                            ts
+                            for ts in map(_to_epoch, stats_data.get("call_timestamps", []))
+                            if ts is not None
+                        )
 
                         # Only cache if there are actual timestamps
-                        if usage_data.get("call_timestamps"):
-                            stats_cache[normalized_filename] = usage_data
-                            processed_count += 1
+                        if not timestamps:
+                            continue
+                        if normalized_filename.startswith(_USER_KEY_PREFIX):
+                            user_counters[normalized_filename] = _TimeSeries(timestamps)
+                        else:
+                            stats_cache[normalized_filename] = {
+                                "call_timestamps": _TimeSeries(timestamps),
+                                "latency_history": _LatencyRing(),
+                            }
+                        processed_count += 1
 
-                return stats_cache, processed_count
+                return stats_cache, user_counters, processed_count
 
             try:
-                self._stats_cache, processed_count = await asyncio.wait_for(
+                self._stats_cache, self._user_counters, processed_count = await asyncio.wait_for(
                     load_stats_with_timeout(), timeout=15.0
                 )
                 log.debug(f"Loaded usage statistics for {processed_count} credential files")
             except asyncio.TimeoutError:
                 log.error("Loading usage statistics timed out after 15 seconds, using empty cache")
-                self._stats_cache = {}
+                self._stats_cache = OrderedDict()
+                self._user_counters = OrderedDict()
                 return
 
         except Exception as e:
             log.error(f"Failed to load usage statistics: {e}")
-            self._stats_cache = {}
+            self._stats_cache = OrderedDict()
+            self._user_counters = OrderedDict()
 
-    async def _save_stats(self):
+    async def _save_stats(self, force: bool = False):
         """Save statistics to unified storage."""
-        current_time = time.time()
+        # Cheapest check first: nothing changed means no clock read and no work
+        if not self._dirty_keys:
+            return
 
-        if not self._cache_dirty or (current_time - self._last_save_time < self._save_interval):
+        current_time = time.time()
+        if not force and current_time - self._last_save_time < self._save_interval:
             return
 
         try:
-            saved_count = 0
-            for filename, stats in self._stats_cache.items():
-                try:
-                    stats_data = {
-                        "call_timestamps": stats.get("call_timestamps", []),
-                    }
-
-                    success = await self._storage_adapter.update_usage_stats(filename, stats_data)
-                    if success:
-                        saved_count += 1
-                except Exception as e:
-                    log.error(f"Failed to save stats for {filename}: {e}")
-                    continue
-
-            self._cache_dirty = False
+            # Only entries changed since the last save are persisted
+            to_save = list(self._dirty_keys)
+            self._dirty_keys.clear()
+            payload = {}
+            for key in to_save:
+                if key in self._stats_cache:
+                    payload[key] = {"call_timestamps": self._stats_cache[key]["call_timestamps"].tolist()}
+                elif key in self._user_counters:
+                    payload[key] = {"call_timestamps": self._user_counters[key].tolist()}
             self._last_save_time = current_time
-            log.debug(
-                f"Successfully saved {saved_count}/{len(self._stats_cache)} usage statistics to unified storage"
-            )
+
+            # One storage call for all files; retried on the next save if it fails
+            if await self._storage_adapter.update_usage_stats_bulk(payload):
+                log.debug(f"Successfully saved {len(payload)} usage statistics to unified storage")
+            else:
+                self._dirty_keys.update(payload)
+                log.error(f"Failed to save {len(payload)} usage statistics to unified storage")
         except Exception as e:
             log.error(f"Failed to save usage statistics: {e}")
 
+    async def _flush_loop(self):
+        """Persist changed statistics every save interval, and once more when cancelled."""
+        try:
+            while True:
+                await asyncio.sleep(self._save_interval)
+                await self._save_stats(force=True)
+        except asyncio.CancelledError:
+            await self._save_stats(force=True)
+            raise
+
     def _get_or_create_stats(self, filename: str) -> Dict[str, Any]:
         """Get or create statistics entry for a credential file."""
-        normalized_filename = self._normalize_filename(filename)
-
-        if normalized_filename not in self._stats_cache:
-            # Control cache size - remove oldest entry if limit reached
-            if len(self._stats_cache) >= self._max_cache_size:
-                # Remove entry with oldest/fewest timestamps
-                oldest_key = min(
-                    self._stats_cache.keys(),
-                    key=lambda k: len(self._stats_cache[k].get("call_timestamps", [])),
-                )
-                del self._stats_cache[oldest_key]
-                self._cache_dirty = True
-                log.debug(f"Removed oldest usage stats cache entry: {oldest_key}")
-
-            self._stats_cache[normalized_filename] = {
-                "call_timestamps": [],
-                "latency_history": [],
-            }
-            self._cache_dirty = True
-
-        return self._stats_cache[normalized_filename]
-
-    def _cleanup_old_timestamps(self, stats: Dict[str, Any]):
-        """Remove timestamps and latency records older than 24 hours."""
-        cutoff_time = _get_24h_ago()
-        
-        # 1. Cleanup Timestamps
-        timestamps = stats.get("call_timestamps", [])
-        if timestamps:
-            new_timestamps = []
-            for ts in timestamps:
-                try:
-                    dt = datetime.fromisoformat(ts).replace(tzinfo=timezone.utc) if datetime.fromisoformat(ts).tzinfo is None else datetime.fromisoformat(ts)
-                    if dt > cutoff_time:
-                        new_timestamps.append(ts)
-                except Exception:
-                    continue
-            if len(new_timestamps) != len(timestamps):
-                stats["call_timestamps"] = new_timestamps
-                self._cache_dirty = True
-
-        # 2. Cleanup Latency History
-        latency_history = stats.get("latency_history", [])
-        if latency_history:
-            new_history = []
-            for record in latency_history:
-                try:
-                    # record is [timestamp, latency_ms]
-                    ts = record[0]
-                    dt = datetime.fromisoformat(ts).replace(tzinfo=timezone.utc) if datetime.fromisoformat(ts).tzinfo is None else datetime.fromisoformat(ts)
-                    if dt > cutoff_time:
-                        new_history.append(record)
-                except Exception:
-                    continue
-            if len(new_history) != len(latency_history):
-                stats["latency_history"] = new_history
-                self._cache_dirty = True
+        return self._get_or_create_stats_norm(self._normalize_filename(filename))
+
+    def _get_or_create_stats_norm(self, normalized_filename: str) -> Dict[str, Any]:
+        """Get or create statistics entry for an already normalized filename."""
+        stats = self._stats_cache.get(normalized_filename)
+        if stats is not None:
+            self._stats_cache.move_to_end(normalized_filename)
+            return stats
+
+        # Control cache size - remove least recently used entry if limit reached
+        if len(self._stats_cache) >= self._max_cache_size:
+            oldest_key, _ = self._stats_cache.popitem(last=False)
+            self._dirty_keys.discard(oldest_key)
+            log.debug(f"Removed least recently used usage stats cache entry: {oldest_key}")
+
+        stats = self._stats_cache[normalized_filename] = {
+            "call_timestamps": _TimeSeries(),
+            "latency_history": _LatencyRing(),
+        }
+        self._dirty_keys.add(normalized_filename)
+        return stats
+
+    def _get_or_create_user_counter(self, user_key: str) -> _TimeSeries:
+        """Get or create the call timestamps for a per-user key."""
+        timestamps = self._user_counters.get(user_key)
+        if timestamps is not None:
+            self._user_counters.move_to_end(user_key)
+            return timestamps
+
+        # Same limit as the file stats cache - remove least recently used users
+        while len(self._user_counters) >= self._max_cache_size:
+            oldest_key, _ = self._user_counters.popitem(last=False)
+            self._dirty_keys.discard(oldest_key)
+            log.debug(f"Removed least recently used user stats entry: {oldest_key}")
+
+        timestamps = self._user_counters[user_key] = _TimeSeries()
+        return timestamps
+
+    def _evict_expired(self, key: str, timestamps: _TimeSeries, cutoff_time: float) -> int:
+        """Drop expired call timestamps, returning how many were removed."""
+        evicted = timestamps.evict(cutoff_time)
+        if evicted:
+            self._dirty_keys.add(key)
+        return evicted
 
     async def record_successful_call(self, filename: str, latency_ms: float = 0.0, model_name: str = None, user_id: str = None):
         """Record a successful API call with latency."""
         if not self._initialized:
             await self.initialize()
 
-        with self._lock:
+        async with self._lock:
             try:
-                current_time = datetime.now(timezone.utc).isoformat()
-                
-                # Helper to update stats dict
-                def update_stats(target_stats):
-                    self._cleanup_old_timestamps(target_stats)
-                    target_stats["call_timestamps"].append(current_time)
-                    
-                    if "latency_history" not in target_stats:
-                        target_stats["latency_history"] = []
-                    target_stats["latency_history"].append([current_time, latency_ms])
+                now_epoch = time.time()
+                cutoff_time = now_epoch - _WINDOW_SECONDS
 
                 # 1. Record against the credential file
                 normalized_filename = self._normalize_filename(filename)
-                
-                stats = self._get_or_create_stats(normalized_filename)
-                update_stats(stats)
-                
+
+                stats = self._get_or_create_stats_norm(normalized_filename)
+                self._evict_expired(normalized_filename, stats["call_timestamps"], cutoff_time)
+                stats["call_timestamps"].append(now_epoch)
+                self._dirty_keys.add(normalized_filename)
+                # Latency samples are kept in memory only, never persisted
+                stats["latency_history"].append(now_epoch, latency_ms)
+
                 # 2. Record against the user (if provided)
                 if user_id:
-                    user_key = f"USER_stats_{user_id}"
-                    user_stats = self._get_or_create_stats(user_key)
-                    update_stats(user_stats)
+                    user_key = f"{_USER_KEY_PREFIX}{user_id}"
+                    user_timestamps = self._get_or_create_user_counter(user_key)
+                    self._evict_expired(user_key, user_timestamps, cutoff_time)
+                    user_timestamps.append(now_epoch)
+                    self._dirty_keys.add(user_key)
 
-                self._cache_dirty = True
-                
                 call_count = len(stats["call_timestamps"])
                 log.debug(f"Usage recorded - File: {normalized_filename}: {call_count}, Latency: {latency_ms}ms, User: {user_id}")
 
             except Exception as e:
                 log.error(f"Failed to record usage statistics: {e}")
 
-        # Save stats asynchronously
-        try:
-            await self._save_stats()
-        except Exception as e:
-            log.error(f"Failed to save usage statistics after recording: {e}")
-            
-    async def get_hourly_latency_trends(self) -> Dict[str, Any]:
-        """Aggregate latency stats by hour for the last 24 hours."""
+    async def get_hourly_overview(self) -> Dict[str, Any]:
+        """Aggregate hourly call counts and latency stats for the last 24 hours in one pass."""
         if not self._initialized:
             await self.initialize()
-            
-        trends = {
-            "labels": [],
-            "avg_latency": [],
-            "p95_latency": []
-        }
-        
-        # Initialize hourly buckets
-        now = datetime.now(timezone.utc)
-        current_hour = now.replace(minute=0, second=0, microsecond=0)
-        start_time = current_hour - timedelta(hours=23)
-        
-        hourly_data = {} # { hour_label: [latencies...] }
-        
-        # Generate labels
-        for i in range(24):
-            hour_time = start_time + timedelta(hours=i)
-            label = hour_time.strftime("%H:00")
-            trends["labels"].append(label)
-            hourly_data[label] = []
-            
-        # Collect all latency records from all credentials (excluding USER_stats)
-        with self._lock:
-            for filename, data in self._stats_cache.items():
-                if filename.startswith("USER_stats_") or filename.startswith("_"):
+
+        now = time.time()
+        # Round down to nearest hour, index 0 is the hour starting 23 hours ago
+        hour = int(now // 3600)
+        start_time = (hour - 23) * 3600
+        cutoff_time = now - _WINDOW_SECONDS
+
+        # Generate labels (e.g. "14:00")
+        labels = list(_labels_for_hour(hour))
+
+        series = []
+        bucket_parts = []
+        latency_parts = []
+        async with self._lock:
+            for filename, stats in self._stats_cache.items():
+                series.append(stats["call_timestamps"])
+
+                if filename.startswith("_"):
                     continue
-                    
-                history = data.get("latency_history", [])
-                for record in history:
-                    try:
-                        ts, latency = record
-                        dt = datetime.fromisoformat(ts).replace(tzinfo=timezone.utc) if datetime.fromisoformat(ts).tzinfo is None else datetime.fromisoformat(ts)
-                        
-                        if dt < start_time:
-                            continue
-                            
-                        # Find bucket (naive approach)
-                        # Round down to hour
-                        bucket_dt = dt.replace(minute=0, second=0, microsecond=0)
-                        label = bucket_dt.strftime("%H:00")
-                        
-                        if label in hourly_data:
-                            hourly_data[label].append(latency)
-                    except Exception:
-                        continue
-                        
-        # Calculate stats
-        for label in trends["labels"]:
-            latencies = hourly_data[label]
-            if not latencies:
-                trends["avg_latency"].append(0)
-                trends["p95_latency"].append(0)
+                timestamps, latencies = stats["latency_history"].since(start_time)
+                if not len(timestamps):
+                    continue
+
+                # Round down to hour
+                index = ((timestamps - start_time) // 3600).astype(np.int64)
+                mask = index < 24
+                bucket_parts.append(index[mask])
+                latency_parts.append(latencies[mask].astype(np.float64))
+
+            # Copy every file's in-window timestamps into one array so bucketing is a
+            # single pass; timestamps are ascending, so the window starts at a binary search
+            arr = np.concatenate(
+                [timestamps.since(cutoff_time) for timestamps in series] or [np.empty(0)]
+            )
+
+        # Call counts: index 23 is current hour, bucket_index = 23 - (hours_ago)
+        hours_ago = ((now - arr) // 3600).astype(np.int64)
+        hours_ago = hours_ago[(hours_ago >= 0) & (hours_ago < 24)]
+        call_counts = np.bincount(23 - hours_ago, minlength=24)
+
+        # Latency stats per hour
+        if bucket_parts:
+            buckets = np.concatenate(bucket_parts)
+            latencies = np.concatenate(latency_parts)
+        else:
+            buckets = np.empty(0, dtype=np.int64)
+            latencies = np.empty(0, dtype=np.float64)
+
+        counts = np.bincount(buckets, minlength=24)
+        sums = np.bincount(buckets, weights=latencies, minlength=24)
+        # Group latencies by bucket so each hour is one contiguous slice
+        # (stable sort on uint8 keys is a linear-time radix sort)
+        grouped = latencies[np.argsort(buckets.astype(np.uint8), kind="stable")]
+        offsets = np.concatenate(([0], np.cumsum(counts))).tolist()
+
+        avg_latency = []
+        p95_latency = []
+        for i, count in enumerate(counts.tolist()):
+            if not count:
+                avg_latency.append(0)
+                p95_latency.append(0)
             else:
-                avg = sum(latencies) / len(latencies)
-                trends["avg_latency"].append(round(avg, 2))
-                
-                # P95
-                latencies.sort()
-                p95_index = int(len(latencies) * 0.95)
-                trends["p95_latency"].append(round(latencies[p95_index], 2))
-                
-        return trends
-            
+                avg_latency.append(round(float(sums[i]) / count, 2))
+
+                # P95 via selection instead of a full sort
+                p95_index = int(count * 0.95)
+                hour_latencies = np.partition(grouped[offsets[i]:offsets[i + 1]], p95_index)
+                p95_latency.append(round(float(hour_latencies[p95_index]), 2))
+
+        return {
+            "labels": labels,
+            "data": call_counts.tolist(),
+            "total_24h": int(call_counts.sum()),
+            "avg_latency": avg_latency,
+            "p95_latency": p95_latency,
+        }
+
+    async def get_hourly_latency_trends(self) -> Dict[str, Any]:
+        """Aggregate latency stats by hour for the last 24 hours."""
+        overview = await self.get_hourly_overview()
+        return {
+            "labels": overview["labels"],
+            "avg_latency": overview["avg_latency"],
+            "p95_latency": overview["p95_latency"],
+        }
+
     async def get_usage_stats(self, filename: str = None) -> Dict[str, Any]:
         """Get usage statistics."""
         if not self._initialized:
             await self.initialize()
 
-        with self._lock:
+        async with self._lock:
+            cutoff_time = time.time() - _WINDOW_SECONDS
             if filename:
-                normalized_filename = self._normalize_filename(filename)
-                stats = self._get_or_create_stats(normalized_filename)
-                self._cleanup_old_timestamps(stats)
-
+                if filename.startswith(_USER_KEY_PREFIX):
+                    # Synthesized user keys (quota checks) are already canonical
+                    key = filename
+                    timestamps = self._user_counters.get(key)
+                    if timestamps is not None:
+                        self._user_counters.move_to_end(key)
+                else:
+                    key = self._normalize_filename(filename)
+                    timestamps = self._get_or_create_stats_norm(key)["call_timestamps"]
+
+                # Timestamps are all inside the window after eviction, so the count is the length
+                calls_24h = 0
+                if timestamps is not None:
+                    self._evict_expired(key, timestamps, cutoff_time)
+                    calls_24h = len(timestamps)
                 return {
-                    "calls_24h": len(stats.get("call_timestamps", [])),
+                    "calls_24h": calls_24h,
                     "last_updated": datetime.now(timezone.utc).isoformat(),
                 }
             
             else:
                 all_stats = {}
-                for filename, stats in self._stats_cache.items():
-                    self._cleanup_old_timestamps(stats)
+                now_iso = datetime.now(timezone.utc).isoformat()
+                series = chain(
+                    ((filename, stats["call_timestamps"]) for filename, stats in self._stats_cache.items()),
+                    self._user_counters.items(),
+                )
+                for filename, timestamps in series:
+                    # A binary search per entry; nothing is moved when nothing expired
+                    self._evict_expired(filename, timestamps, cutoff_time)
                     all_stats[filename] = {
-                        "calls_24h": len(stats.get("call_timestamps", [])),
-                        "last_updated": datetime.now(timezone.utc).isoformat(),
+                        "calls_24h": len(timestamps),
+                        "last_updated": now_iso,
                     }
                 return all_stats
 
     async def get_hourly_usage_trends(self) -> Dict[str, Any]:
         """Aggregate usage stats into hourly buckets for the last 24 hours."""
-        if not self._initialized:
-            await self.initialize()
-
-        with self._lock:
-            # Initialize empty buckets for last 24h
-            now = datetime.now(timezone.utc)
-            # Round down to nearest hour
-            current_hour = now.replace(minute=0, second=0, microsecond=0)
-            
-            # Generate labels (e.g. "14:00") and initialize counts
-            labels = []
-            counts = [0] * 24
-            
-            # We want -23h to Now (0h)
-            for i in range(23, -1, -1):
-                t = current_hour - timedelta(hours=i)
-                labels.append(t.strftime("%H:00"))
-
-            cutoff_time = _get_24h_ago()
-
-            # Iterate all cached stats
-            for filename, stats in self._stats_cache.items():
-                # Skip User aggregates to avoid double counting if we are summing file stats
-                # or decided to show total system load. 
-                # "USER_stats_" keys are aggregates of user calls. 
-                # Credential files are the source.
-                # If we sum credential files, we get total system load.
-                if filename.startswith("USER_stats_"):
-                    continue
-                    
-                timestamps = stats.get("call_timestamps", [])
-                for ts in timestamps:
-                    try:
-                        dt = datetime.fromisoformat(ts)
-                        if dt.tzinfo is None:
-                            dt = dt.replace(tzinfo=timezone.utc)
-                        
-                        if dt > cutoff_time:
-                            # Calculate hour difference from now
-                            # But easier to just map to 0-23 index
-                            # Index 23 is current hour. Index 0 is 23 hours ago.
-                            
-                            # Identify which bucket implies:
-                            # bucket_index = 23 - (hours_ago)
-                            
-                            diff = now - dt
-                            hours_ago = int(diff.total_seconds() / 3600)
-                            
-                            if 0 <= hours_ago < 24:
-                                index = 23 - hours_ago
-                                if 0 <= index < 24:
-                                    counts[index] += 1
-                    except:
-                        continue
-            
-            return {
-                "labels": labels,
-                "data": counts,
-                "total_24h": sum(counts)
-            }
+        overview = await self.get_hourly_overview()
+        return {
+            "labels": overview["labels"],
+            "data": overview["data"],
+            "total_24h": overview["total_24h"],
+        }
 
     async def get_aggregated_stats(self) -> Dict[str, Any]:
         """Get aggregated statistics across all credential files."""
@@ -424,18 +561,25 @@ class UsageStats:
         if not self._initialized:
             await self.initialize()
 
-        with self._lock:
+        async with self._lock:
             if filename:
                 normalized_filename = self._normalize_filename(filename)
                 if normalized_filename in self._stats_cache:
-                    self._stats_cache[normalized_filename]["call_timestamps"] = []
-                    self._cache_dirty = True
+                    self._stats_cache[normalized_filename]["call_timestamps"].clear()
+                    self._dirty_keys.add(normalized_filename)
+                    log.info(f"Reset usage statistics for {normalized_filename}")
+                elif normalized_filename in self._user_counters:
+                    self._user_counters[normalized_filename].clear()
+                    self._dirty_keys.add(normalized_filename)
                     log.info(f"Reset usage statistics for {normalized_filename}")
             else:
                 # Reset all statistics
                 for stats in self._stats_cache.values():
-                    stats["call_timestamps"] = []
-                self._cache_dirty = True
+                    stats["call_timestamps"].clear()
+                for timestamps in self._user_counters.values():
+                    timestamps.clear()
+                self._dirty_keys.update(self._stats_cache)
+                self._dirty_keys.update(self._user_counters)
                 log.info("Reset usage statistics for all credential files")
 
         await self._save_stats()
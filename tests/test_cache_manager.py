@@ -0,0 +1,155 @@
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.storage.cache_manager import CacheBackend, UnifiedCacheManager
+
+
+class MemoryBackend(CacheBackend):
+    """In-memory backend recording every write; per-key writes can be switched off"""
+
+    def __init__(self, data=None, partial=True):
+        self.data = dict(data or {})
+        self.partial = partial
+        self.write_ok = True
+        self.writes = []
+        self.patched = []
+        self.deleted = []
+
+    async def load_data(self):
+        return dict(self.data)
+
+    async def write_data(self, data):
+        return await self.write_changes(data, set(data))
+
+    async def write_changes(self, data, changed_keys):
+        self.writes.append(set(changed_keys))
+        if self.write_ok:
+            self.data = dict(data)
+        return self.write_ok
+
+    async def patch_key(self, key, value):
+        if not self.partial:
+            return False
+        self.data[key] = value
+        self.patched.append(key)
+        return True
+
+    async def delete_key(self, key):
+        if not self.partial:
+            return False
+        self.data.pop(key, None)
+        self.deleted.append(key)
+        return True
+
+
+def make_manager(backend):
+    return UnifiedCacheManager(backend, name="test")
+
+
+def test_patch_writes_through_without_full_write():
+    async def run():
+        backend = MemoryBackend({"a": 1})
+        manager = make_manager(backend)
+
+        assert await manager.patch("b", 2)
+        assert await manager.get("b") == 2
+        assert backend.data == {"a": 1, "b": 2}
+        assert backend.patched == ["b"]
+
+        await manager.stop()
+        assert backend.writes == []
+
+    asyncio.run(run())
+
+
+def test_patch_falls_back_to_full_write():
+    async def run():
+        backend = MemoryBackend({"a": 1}, partial=False)
+        manager = make_manager(backend)
+
+        assert await manager.patch("a", 10)
+        assert backend.data == {"a": 1}
+
+        await manager.stop()
+        assert backend.writes == [{"a"}]
+        assert backend.data == {"a": 10}
+
+    asyncio.run(run())
+
+
+def test_patch_delete():
+    async def run():
+        backend = MemoryBackend({"a": 1, "b": 2})
+        manager = make_manager(backend)
+
+        assert await manager.patch_delete("a")
+        assert await manager.get("a") is None
+        assert backend.data == {"b": 2}
+        assert backend.deleted == ["a"]
+
+        assert not await manager.patch_delete("missing")
+        assert backend.deleted == ["a"]
+
+        await manager.stop()
+        assert backend.writes == []
+
+    asyncio.run(run())
+
+
+def test_patch_delete_falls_back_to_full_write():
+    async def run():
+        backend = MemoryBackend({"a": 1, "b": 2}, partial=False)
+        manager = make_manager(backend)
+
+        assert await manager.patch_delete("a")
+        await manager.stop()
+
+        assert backend.writes == [{"a"}]
+        assert backend.data == {"b": 2}
+
+    asyncio.run(run())
+
+
+def test_snapshot_is_live_reference():
+    async def run():
+        manager = make_manager(MemoryBackend({"a": 1}))
+
+        snapshot = await manager.snapshot()
+        copy = await manager.get_all()
+        version = manager.version
+        await manager.set("b", 2)
+
+        assert snapshot == {"a": 1, "b": 2}
+        assert copy == {"a": 1}
+        assert await manager.snapshot() is snapshot
+        assert manager.version > version
+
+    asyncio.run(run())
+
+
+def test_failed_write_keeps_changed_keys():
+    async def run():
+        backend = MemoryBackend({"a": 1})
+        manager = make_manager(backend)
+
+        backend.write_ok = False
+        await manager.set("a", 2)
+        await manager.stop()
+        assert backend.writes == [{"a"}]
+
+        backend.write_ok = True
+        await manager.update_multi({"b": 3})
+        await manager.delete("a")
+        await manager.stop()
+
+        assert backend.writes[-1] == {"a", "b"}
+        assert backend.data == {"b": 3}
+
+        # Everything written: nothing left to flush
+        await manager.stop()
+        assert len(backend.writes) == 2
+
+    asyncio.run(run())
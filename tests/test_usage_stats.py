@@ -0,0 +1,236 @@
+import asyncio
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import usage_stats
+from src.usage_stats import UsageStats, _TimeSeries, _to_epoch
+
+
+class FakeStorageAdapter:
+    """Serves preset usage stats and records every bulk save; fails while ok is False"""
+
+    def __init__(self, stored=None):
+        self.stored = stored or {}
+        self.saved = []
+        self.ok = True
+
+    async def get_all_usage_stats(self):
+        return self.stored
+
+    async def update_usage_stats_bulk(self, stats_by_file):
+        self.saved.append(stats_by_file)
+        return self.ok
+
+
+def make_stats(stored=None):
+    stats = UsageStats()
+    stats._storage_adapter = FakeStorageAdapter(stored)
+    stats._initialized = True
+    return stats
+
+
+# --- epoch timestamps ---
+
+def test_to_epoch_accepts_floats_and_legacy_iso_strings():
+    assert _to_epoch(1700000000) == 1700000000.0
+    assert _to_epoch(1700000000.5) == 1700000000.5
+    # Naive legacy strings were written in UTC
+    assert _to_epoch("2023-11-14T22:13:20") == 1700000000.0
+    assert _to_epoch("2023-11-14T22:13:20+00:00") == 1700000000.0
+    assert _to_epoch("not a date") is None
+    assert _to_epoch(None) is None
+
+
+def test_load_converts_legacy_timestamps_once():
+    async def run():
+        stats = make_stats({
+            "creds/a.json": {"call_timestamps": ["2023-11-14T22:13:21", 1700000000.0, "garbage"]},
+            "empty.json": {"call_timestamps": []},
+        })
+        await stats._load_stats()
+
+        assert list(stats._stats_cache) == ["a.json"]
+        assert stats._stats_cache["a.json"]["call_timestamps"].tolist() == [1700000000.0, 1700000001.0]
+
+    asyncio.run(run())
+
+
+def test_saved_timestamps_are_epoch_floats():
+    async def run():
+        stats = make_stats()
+        await stats.record_successful_call("a.json")
+        await stats._save_stats(force=True)
+
+        (timestamp,) = stats._storage_adapter.saved[0]["a.json"]["call_timestamps"]
+        assert isinstance(timestamp, float)
+
+    asyncio.run(run())
+
+
+# --- dirty-key bulk save ---
+
+def test_save_stats_sends_only_dirty_keys():
+    async def run():
+        stats = make_stats()
+        adapter = stats._storage_adapter
+
+        await stats.record_successful_call("creds/a.json", user_id="u1")
+        await stats.record_successful_call("b.json")
+        await stats._save_stats(force=True)
+
+        assert len(adapter.saved) == 1
+        assert set(adapter.saved[0]) == {"a.json", "b.json", "USER_stats_u1"}
+        assert len(adapter.saved[0]["a.json"]["call_timestamps"]) == 1
+
+        # Nothing changed: no storage call at all
+        await stats._save_stats(force=True)
+        assert len(adapter.saved) == 1
+
+        await stats.record_successful_call("a.json")
+        await stats._save_stats(force=True)
+        assert list(adapter.saved[1]) == ["a.json"]
+        assert len(adapter.saved[1]["a.json"]["call_timestamps"]) == 2
+
+    asyncio.run(run())
+
+
+def test_save_stats_retries_failed_keys():
+    async def run():
+        stats = make_stats()
+        adapter = stats._storage_adapter
+        adapter.ok = False
+
+        await stats.record_successful_call("a.json")
+        await stats._save_stats(force=True)
+        assert stats._dirty_keys == {"a.json"}
+
+        adapter.ok = True
+        await stats.record_successful_call("b.json")
+        await stats._save_stats(force=True)
+        assert set(adapter.saved[-1]) == {"a.json", "b.json"}
+        assert not stats._dirty_keys
+
+    asyncio.run(run())
+
+
+def test_save_stats_respects_interval_unless_forced():
+    async def run():
+        stats = make_stats()
+        adapter = stats._storage_adapter
+
+        await stats.record_successful_call("a.json")
+        await stats._save_stats(force=True)
+        await stats.record_successful_call("a.json")
+        await stats._save_stats()
+        assert len(adapter.saved) == 1
+
+        await stats._save_stats(force=True)
+        assert len(adapter.saved) == 2
+
+    asyncio.run(run())
+
+
+# --- _TimeSeries ---
+
+def test_time_series_evict_drops_expired_prefix():
+    series = _TimeSeries([1.0, 2.0, 3.0, 4.0, 5.0])
+
+    assert series.evict(0.5) == 0
+    # Timestamps equal to the cutoff are expired too
+    assert series.evict(3.0) == 3
+    assert series.tolist() == [4.0, 5.0]
+    assert len(series) == 2
+
+    assert series.evict(10.0) == 2
+    assert len(series) == 0
+    assert series.evict(20.0) == 0
+
+
+def test_time_series_since_does_not_evict():
+    series = _TimeSeries([1.0, 2.0, 3.0])
+
+    assert series.since(1.5).tolist() == [2.0, 3.0]
+    assert series.since(3.0).tolist() == []
+    assert series.tolist() == [1.0, 2.0, 3.0]
+
+
+def test_time_series_append_stays_ascending():
+    series = _TimeSeries([10.0])
+    # A wall clock step back is clamped to the last timestamp
+    series.append(5.0)
+    series.append(11.0)
+
+    assert series.tolist() == [10.0, 10.0, 11.0]
+    assert np.all(np.diff(series.view()) >= 0)
+
+
+def test_time_series_compacts_expired_space():
+    capacity = usage_stats._SERIES_INITIAL_CAPACITY
+    series = _TimeSeries()
+    for i in range(capacity):
+        series.append(float(i))
+    buffer = series.buffer
+
+    # Expire more than half, then append at the end of the full buffer
+    series.evict(float(capacity // 2))
+    series.append(float(capacity))
+
+    assert series.buffer is buffer
+    assert series.start == 0
+    assert series.tolist() == [float(i) for i in range(capacity // 2 + 1, capacity + 1)]
+
+
+def test_time_series_grows_when_mostly_live():
+    capacity = usage_stats._SERIES_INITIAL_CAPACITY
+    series = _TimeSeries()
+    for i in range(capacity + 1):
+        series.append(float(i))
+
+    assert len(series.buffer) == capacity * 2
+    assert series.tolist() == [float(i) for i in range(capacity + 1)]
+
+
+def test_expired_timestamps_mark_key_dirty():
+    async def run():
+        stats = make_stats()
+        adapter = stats._storage_adapter
+        old = usage_stats.time.time() - usage_stats._WINDOW_SECONDS - 60
+        stats._stats_cache["a.json"] = {
+            "call_timestamps": _TimeSeries([old, old + 1]),
+            "latency_history": usage_stats._LatencyRing(),
+        }
+
+        await stats.record_successful_call("a.json")
+        await stats._save_stats(force=True)
+
+        # The expired entries are gone from the persisted copy as well
+        assert len(adapter.saved[0]["a.json"]["call_timestamps"]) == 1
+
+    asyncio.run(run())
+
+
+# --- per-user counters ---
+
+def test_user_counters_are_bounded_lru():
+    async def run():
+        stats = make_stats()
+        stats._max_cache_size = 2
+
+        for user_id in ("u1", "u2", "u3"):
+            await stats.record_successful_call("a.json", user_id=user_id)
+        assert list(stats._user_counters) == ["USER_stats_u2", "USER_stats_u3"]
+        assert "USER_stats_u1" not in stats._dirty_keys
+
+        # A quota check counts as a use
+        assert (await stats.get_usage_stats("USER_stats_u2"))["calls_24h"] == 1
+        await stats.record_successful_call("a.json", user_id="u4")
+        assert list(stats._user_counters) == ["USER_stats_u2", "USER_stats_u4"]
+
+        # User entries never take slots from credential files
+        assert list(stats._stats_cache) == ["a.json"]
+
+    asyncio.run(run())
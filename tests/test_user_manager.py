@@ -0,0 +1,274 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import user_manager as user_manager_module
+from src.user_manager import UserManager
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "users.db")
+    monkeypatch.setattr(user_manager_module, "DB_PATH", path)
+    monkeypatch.setattr(user_manager_module, "DB_IS_URI", False)
+    return path
+
+
+@pytest.fixture
+def manager(db_path, monkeypatch):
+    # UserManager is a process-wide singleton; give each test its own instance
+    monkeypatch.setattr(UserManager, "_instance", None)
+    return UserManager()
+
+
+def run_with(manager, test):
+    async def run():
+        await manager.initialize()
+        try:
+            await test()
+        finally:
+            await manager.close()
+
+    asyncio.run(run())
+
+
+def query(db_path, sql, params=()):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+# --- password hashing ---
+
+def test_legacy_sha256_hash_is_upgraded_on_login(manager, db_path):
+    legacy = hashlib.sha256(("secret" + user_manager_module._LEGACY_SALT).encode()).hexdigest()
+
+    async def test():
+        await manager._execute(
+            "INSERT INTO users (id, username, password_hash, created_at) VALUES (?, ?, ?, ?)",
+            ("u1", "old", legacy, 0.0),
+        )
+        assert await manager.login("old", "wrong") is None
+        assert query(db_path, "SELECT password_hash FROM users WHERE id='u1'")[0][0] == legacy
+
+        result = await manager.login("old", "secret")
+        assert result["user_id"] == "u1"
+        assert await manager.verify_token(result["token"]) == "u1"
+
+        stored = query(db_path, "SELECT password_hash FROM users WHERE id='u1'")[0][0]
+        assert stored != legacy
+        assert UserManager._verify_password(stored, "secret") == (True, False)
+        # The upgraded hash keeps working
+        assert (await manager.login("old", "secret"))["user_id"] == "u1"
+
+    run_with(manager, test)
+
+
+def test_verify_password_formats():
+    current = UserManager._hash_password("pw")
+    assert UserManager._verify_password(current, "pw") == (True, False)
+    assert UserManager._verify_password(current, "other") == (False, False)
+    assert UserManager._verify_password("scrypt$bad", "pw") == (False, False)
+
+
+
+def test_unknown_username_still_verifies_a_hash(manager, monkeypatch):
+    verified = []
+    verify = UserManager._verify_password
+
+    def spy(stored, password):
+        verified.append(stored)
+        return verify(stored, password)
+
+    monkeypatch.setattr(UserManager, "_verify_password", staticmethod(spy))
+
+    async def test():
+        assert await manager.login("nobody", "pw") is None
+        # Same hashing cost as a real account, so timing does not reveal the username exists
+        assert verified == [user_manager_module._DUMMY_PASSWORD_HASH]
+        assert verify(verified[0], "pw") == (False, False)
+
+    run_with(manager, test)
+
+# --- schema migrations ---
+
+FIRST_RELEASE_SCHEMA = """
+    CREATE TABLE users (id TEXT PRIMARY KEY, username TEXT UNIQUE NOT NULL,
+                        password_hash TEXT NOT NULL, created_at REAL);
+    CREATE TABLE tokens (token TEXT PRIMARY KEY, user_id TEXT NOT NULL, expires_at REAL,
+                         FOREIGN KEY(user_id) REFERENCES users(id));
+    INSERT INTO users VALUES ('u1', 'old', 'x', 0);
+    INSERT INTO tokens VALUES ('t1', 'u1', 1e12);
+"""
+
+
+def create_schema(db_path, script):
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executescript(script)
+    finally:
+        conn.close()
+
+
+def test_migration_adds_missing_user_columns(manager, db_path):
+    create_schema(db_path, FIRST_RELEASE_SCHEMA)
+
+    manager._init_sqlite_oneshot()
+
+    user_cols = {r[1] for r in query(db_path, "PRAGMA table_info(users)")}
+    assert {"role", "api_key", "quota_daily", "disabled"} <= user_cols
+    assert query(db_path, "SELECT id, role, quota_daily, disabled FROM users") == [("u1", "user", 0, 0)]
+
+    # ADD COLUMN cannot carry UNIQUE, so api_key gets a unique index instead
+    unique_indexes = [idx[1] for idx in query(db_path, "PRAGMA index_list(users)") if idx[2]]
+    assert any(
+        query(db_path, f"PRAGMA index_info('{name}')")[0][2] == "api_key" for name in unique_indexes
+    )
+
+    # Running again on a migrated database changes nothing
+    manager._init_sqlite_oneshot()
+    assert query(db_path, "SELECT id, role, quota_daily, disabled FROM users") == [("u1", "user", 0, 0)]
+
+
+def test_migration_rebuilds_tokens_with_cascade(manager, db_path):
+    create_schema(db_path, FIRST_RELEASE_SCHEMA + "INSERT INTO tokens VALUES ('orphan', 'gone', 1e12);")
+
+    manager._init_sqlite_oneshot()
+
+    fks = query(db_path, "PRAGMA foreign_key_list(tokens)")
+    assert [fk[6] for fk in fks] == ["CASCADE"]
+    # Orphaned rows are dropped by the rebuild
+    assert query(db_path, "SELECT token, user_id FROM tokens") == [("t1", "u1")]
+
+
+# --- tokens ---
+
+def test_deleting_user_cascades_to_tokens(manager, db_path):
+    async def test():
+        assert await manager.register("bob", "pw")
+        result = await manager.login("bob", "pw")
+        token, user_id = result["token"], result["user_id"]
+        await manager.create_user_token(user_id)
+        assert await manager.verify_token(token) == user_id
+        assert len(query(db_path, "SELECT token FROM tokens WHERE user_id=?", (user_id,))) == 2
+
+        assert await manager.delete_user(user_id)
+
+        assert query(db_path, "SELECT token FROM tokens WHERE user_id=?", (user_id,)) == []
+        assert await manager.verify_token(token) is None
+
+    run_with(manager, test)
+
+
+def test_migration_copies_disabled_flag_to_tokens(manager, db_path):
+    create_schema(db_path, """
+        CREATE TABLE users (id TEXT PRIMARY KEY, username TEXT UNIQUE NOT NULL,
+                            password_hash TEXT NOT NULL, created_at REAL, disabled INTEGER DEFAULT 0);
+        CREATE TABLE tokens (token TEXT PRIMARY KEY, user_id TEXT NOT NULL, expires_at REAL,
+                             FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE);
+        INSERT INTO users VALUES ('u1', 'off', 'x', 0, 1);
+        INSERT INTO users VALUES ('u2', 'on', 'y', 0, 0);
+        INSERT INTO tokens VALUES ('t1', 'u1', 1e12);
+        INSERT INTO tokens VALUES ('t2', 'u2', 1e12);
+    """)
+
+    manager._init_sqlite_oneshot()
+
+    assert query(db_path, "SELECT token, disabled FROM tokens ORDER BY token") == [("t1", 1), ("t2", 0)]
+
+
+def test_disabling_user_disables_tokens(manager, db_path):
+    async def test():
+        assert await manager.register("alice", "pw")
+        result = await manager.login("alice", "pw")
+        token, user_id = result["token"], result["user_id"]
+        assert await manager.verify_token(token) == user_id
+
+        await manager.update_user_status(user_id, disabled=True)
+        # The cached token must not outlive the disable
+        assert await manager.verify_token(token) is None
+        assert query(db_path, "SELECT disabled FROM tokens WHERE token=?", (token,)) == [(1,)]
+        assert await manager.login("alice", "pw") is None
+
+        # Tokens created while disabled inherit the flag
+        impersonated = await manager.create_user_token(user_id)
+        assert await manager.verify_token(impersonated) is None
+
+        await manager.update_user_status(user_id, disabled=False)
+        assert await manager.verify_token(token) == user_id
+        assert await manager.verify_token(impersonated) == user_id
+
+        # Quota-only updates leave the token flag alone
+        await manager.update_user_status(user_id, quota_daily=5)
+        assert await manager.verify_token(token) == user_id
+
+    run_with(manager, test)
+
+
+def test_disable_is_atomic_across_users_and_tokens(manager, db_path):
+    async def test():
+        assert await manager.register("carol", "pw")
+        result = await manager.login("carol", "pw")
+        token, user_id = result["token"], result["user_id"]
+        assert await manager.verify_token(token) == user_id
+
+        create_schema(db_path, """
+            CREATE TRIGGER fail_tokens BEFORE UPDATE ON tokens BEGIN SELECT RAISE(ABORT, 'boom'); END;
+        """)
+        with pytest.raises(sqlite3.IntegrityError):
+            await manager.update_user_status(user_id, disabled=True)
+
+        # The users update rolled back with the failed tokens update
+        assert query(db_path, "SELECT disabled FROM users WHERE id=?", (user_id,)) == [(0,)]
+        assert query(db_path, "SELECT disabled FROM tokens WHERE token=?", (token,)) == [(0,)]
+        # The cache is dropped even when the update fails
+        assert token not in manager._token_cache
+
+    run_with(manager, test)
+
+
+# --- default admin ---
+
+def test_existing_admin_is_not_rehashed(manager, db_path, monkeypatch):
+    async def test():
+        (admin_hash,) = query(db_path, "SELECT password_hash FROM users WHERE username='admin'")[0]
+        assert await manager.login("admin", "admin") is not None
+
+        def no_hash(password):
+            raise AssertionError("admin password hashed again")
+
+        monkeypatch.setattr(UserManager, "_hash_password", staticmethod(no_hash))
+        await manager._execute("UPDATE users SET role='user' WHERE username='admin'")
+        manager._admin_ensured = False
+
+        await manager.create_admin_if_not_exists()
+
+        assert query(db_path, "SELECT role, password_hash FROM users WHERE username='admin'") == [("admin", admin_hash)]
+
+    run_with(manager, test)
+
+
+# --- auth cache ---
+
+def test_auth_cache_can_be_disabled(manager, monkeypatch):
+    monkeypatch.setattr(user_manager_module, "AUTH_CACHE_TTL", 0)
+
+    async def test():
+        assert await manager.register("dave", "pw")
+        result = await manager.login("dave", "pw")
+        user_id = result["user_id"]
+
+        assert await manager.verify_token(result["token"]) == user_id
+        assert await manager.get_user_by_api_key(result["api_key"]) == user_id
+        assert not manager._token_cache
+        assert not manager._apikey_cache
+
+    run_with(manager, test)
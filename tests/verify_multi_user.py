@@ -33,7 +33,7 @@ os.makedirs(TEST_DIR, exist_ok=True)
 
 # Mock environment variables
 os.environ["CREDENTIALS_DIR"] = TEST_DIR
-os.environ["USERS_DB_PATH"] = os.path.join(TEST_DIR, "users.db")
+os.environ["USERS_DB_PATH"] = "file::memory:?cache=shared"
 
 # Import app after setting env vars
 from web import app
@@ -52,30 +52,11 @@ def setup_module():
             print(f"Warning: Failed to clean up TEST_DIR in setup: {e}")
     os.makedirs(TEST_DIR, exist_ok=True)
     
-    # Initialize user manager db
-    import sqlite3
-    conn = sqlite3.connect(os.environ["USERS_DB_PATH"])
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id TEXT PRIMARY KEY,
-            username TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            created_at REAL
-        )
-    """)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS tokens (
-            token TEXT PRIMARY KEY,
-            user_id TEXT NOT NULL,
-            expires_at REAL,
-            FOREIGN KEY(user_id) REFERENCES users(id)
-        )
-    """)
-    conn.commit()
-    conn.close()
+    # Initialize user manager db with the production schema
+    asyncio.run(user_manager.initialize())
 
 def teardown_module():
+    asyncio.run(user_manager.close())
     if os.path.exists(TEST_DIR):
         try:
             shutil.rmtree(TEST_DIR)
@@ -4,61 +4,186 @@ Main Web Integration - Integrates all routers and modules
 """
 
 import asyncio
+import hashlib
+import mimetypes
+import os
+import socket
+from collections.abc import Collection
 from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Optional
 
 from dotenv import load_dotenv
 
 # 加载 .env 文件
 load_dotenv()
 
-from fastapi import FastAPI, Response
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from config import get_server_host, get_server_port
+from config import get_server_host, get_server_port, init_config
 from log import log
 
 # Import managers and utilities
 from src.credential_manager import get_credential_manager
-from src.routers.gemini import router as gemini_router
-from src.routers.openai import router as openai_router
-from src.routers.auth import router as auth_router
-from src.routers.admin import router as admin_router
-from src.routers.user import router as user_router
-from src.routers.credentials import router as credentials_router
-from src.routers.dashboard import router as dashboard_router
-from src.task_manager import shutdown_all_tasks
+from src.task_manager import create_managed_task, shutdown_all_tasks
 
 # Note: web_router is removed in favor of split routers
 
+try:
+    import orjson
+
+    class ORJSONResponse(JSONResponse):
+        """使用 orjson 序列化的 JSON 响应（未安装 orjson 时回退为 JSONResponse）"""
+
+        def render(self, content) -> bytes:
+            return orjson.dumps(
+                content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            )
+
+except ImportError:
+    ORJSONResponse = JSONResponse
+
+# CORS 响应头（预先编码为 bytes，避免每个请求重复编码）
+_CORS_ALLOW_METHODS = (b"DELETE", b"GET", b"HEAD", b"OPTIONS", b"PATCH", b"POST", b"PUT", b"QUERY")
+_CORS_PREFLIGHT_HEADERS = (
+    (
+        b"vary",
+        b"Origin, Access-Control-Request-Method, Access-Control-Request-Headers, "
+        b"Access-Control-Request-Private-Network",
+    ),
+    (b"access-control-allow-methods", b", ".join(_CORS_ALLOW_METHODS)),
+    # 浏览器缓存预检结果 24 小时，减少重复的 OPTIONS 请求
+    (b"access-control-max-age", b"86400"),
+)
+_CORS_VARY = (b"vary", b"Origin")
+_CORS_CREDENTIALS = (b"access-control-allow-credentials", b"true")
+_CORS_ANY_ORIGIN = (b"access-control-allow-origin", b"*")
+
+# 保活接口的固定响应
+_KEEPALIVE_START = {"type": "http.response.start", "status": 200, "headers": [(b"content-length", b"0")]}
+_KEEPALIVE_BODY = {"type": "http.response.body", "body": b""}
+
+# 生命周期日志文本
+_LOG_STARTUP = "启动 GCLI2API 主服务"
+_LOG_CONFIG_OK = "配置初始化成功"
+_LOG_CM_OK = "凭证管理器初始化成功"
+_LOG_UM_OK = "用户管理器初始化成功"
+_LOG_SHUTDOWN = "开始关闭 GCLI2API 主服务"
+_LOG_TASKS_CLOSED = "所有异步任务已关闭"
+_LOG_CM_CLOSED = "凭证管理器已关闭"
+_LOG_UM_CLOSED = "用户管理器已关闭"
+_LOG_STOPPED = "GCLI2API 主服务已停止"
+
+
+class PureCORSMiddleware:
+    """纯 ASGI CORS 中间件：允许所有方法和请求头。
+
+    allow_origins 含 "*" 时允许任意来源且不携带凭据；否则只允许列表中的来源，回显 Origin 并允许携带凭据。
+    """
+
+    def __init__(self, app: ASGIApp, allow_origins: Collection[str] = ("*",)):
+        self.app = app
+        self.allow_all_origins = "*" in allow_origins
+        self.allow_origins = frozenset(o.encode() for o in allow_origins)
+        if self.allow_all_origins:
+            self.preflight_headers = (*_CORS_PREFLIGHT_HEADERS, _CORS_ANY_ORIGIN)
+        else:
+            self.preflight_headers = (*_CORS_PREFLIGHT_HEADERS, _CORS_CREDENTIALS)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = request_method = request_headers = None
+        private_network = False
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                request_method = value
+            elif name == b"access-control-request-headers":
+                request_headers = value
+            elif name == b"access-control-request-private-network":
+                private_network = True
+
+        # 预检请求直接应答，不进入应用
+        if origin is not None and request_method is not None and scope["method"] == "OPTIONS":
+            headers = list(self.preflight_headers)
+            failures = []
+            if not self.allow_all_origins:
+                if origin in self.allow_origins:
+                    headers.append((b"access-control-allow-origin", origin))
+                else:
+                    failures.append("origin")
+            if request_headers is not None:
+                headers.append((b"access-control-allow-headers", request_headers))
+            if request_method not in _CORS_ALLOW_METHODS:
+                failures.append("method")
+            if private_network:
+                failures.append("private-network")
+            body = ("Disallowed CORS " + ", ".join(failures)).encode() if failures else b"OK"
+            headers.append((b"content-type", b"text/plain; charset=utf-8"))
+            headers.append((b"content-length", str(len(body)).encode()))
+            await send({"type": "http.response.start", "status": 400 if failures else 200, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        if origin is None:
+            extra = (_CORS_VARY,)
+        elif self.allow_all_origins:
+            extra = (_CORS_ANY_ORIGIN, _CORS_VARY)
+        elif origin in self.allow_origins:
+            extra = ((b"access-control-allow-origin", origin), _CORS_CREDENTIALS, _CORS_VARY)
+        else:
+            extra = (_CORS_CREDENTIALS, _CORS_VARY)
+
+        async def send_with_cors(message: Message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *extra]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理"""
-    log.info("启动 GCLI2API 主服务")
+    log.info(_LOG_STARTUP)
     
     # 初始化配置
     import config
     await config.init_config()
-    log.info("配置初始化成功")
-
-    # 初始化全局凭证管理器
+    log.info(_LOG_CONFIG_OK)
+
+    # 并发初始化全局凭证管理器和用户管理器（两者互不依赖）
+    # get_credential_manager 内部会自动 initialize；main() 已提前启动预加载时直接等待其结果
+    from src.user_manager import user_manager
+    cm_init = _cm_preload if _cm_preload is not None else get_credential_manager()
+    cm_result, um_result = await asyncio.gather(
+        cm_init, user_manager.initialize(), return_exceptions=True
+    )
+    if isinstance(cm_result, BaseException):
+        log.error(f"凭证管理器初始化失败: {cm_result}")
+    else:
+        log.info(_LOG_CM_OK)
+    if isinstance(um_result, BaseException):
+        log.error(f"用户管理器初始化失败: {um_result}")
+    else:
+        log.info(_LOG_UM_OK)
+
+    # 预先生成 OpenAPI schema（FastAPI 会缓存在 app.openapi_schema），避免首次访问 /openapi.json 时现场构建
     try:
-        # 使用 src/credential_manager.py 中的单例
-        cm = await get_credential_manager()
-        # get_credential_manager 内部会自动 initialize
-        log.info("凭证管理器初始化成功")
-        
-        # 初始化用户管理器
-        from src.user_manager import user_manager
-        await user_manager.initialize()
-        log.info("用户管理器初始化成功")
-        
+        app.openapi()
     except Exception as e:
-        log.error(f"管理器初始化失败: {e}")
+        log.error(f"生成 OpenAPI schema 失败: {e}")
 
     # 自动从环境变量加载凭证（异步执行）
     try:
-        import asyncio
         from src.services.auth_service import auth_service
 
         async def load_env_creds():
@@ -67,30 +192,102 @@ async def lifespan(app: FastAPI):
             except Exception as e:
                 log.error(f"自动加载环境变量凭证失败: {e}")
 
-        asyncio.create_task(load_env_creds())
+        # 交给任务管理器持有引用，关闭时统一取消
+        create_managed_task(load_env_creds(), name="auto-load-env-creds")
     except Exception as e:
         log.error(f"创建自动加载环境变量凭证任务失败: {e}")
 
     yield
 
     # 清理资源
-    log.info("开始关闭 GCLI2API 主服务")
+    log.info(_LOG_SHUTDOWN)
 
-    try:
-        await shutdown_all_tasks(timeout=10.0)
-        log.info("所有异步任务已关闭")
-    except Exception as e:
-        log.error(f"关闭异步任务时出错: {e}")
-
-    # 关闭凭证管理器
-    try:
+    # 关闭异步任务与关闭凭证管理器互不依赖，并发执行
+    async def close_cm():
         cm = await get_credential_manager()
         await cm.close()
-        log.info("凭证管理器已关闭")
-    except Exception as e:
-        log.error(f"关闭凭证管理器时出错: {e}")
 
-    log.info("GCLI2API 主服务已停止")
+    tasks_result, cm_result = await asyncio.gather(
+        shutdown_all_tasks(timeout=10.0), close_cm(), return_exceptions=True
+    )
+    if isinstance(tasks_result, BaseException):
+        log.error(f"关闭异步任务时出错: {tasks_result}")
+    else:
+        log.info(_LOG_TASKS_CLOSED)
+    if isinstance(cm_result, BaseException):
+        log.error(f"关闭凭证管理器时出错: {cm_result}")
+    else:
+        log.info(_LOG_CM_CLOSED)
+
+    # 关闭用户管理器数据库连接
+    try:
+        from src.user_manager import user_manager
+        await user_manager.close()
+        log.info(_LOG_UM_CLOSED)
+    except Exception as e:
+        log.error(f"关闭用户管理器时出错: {e}")
+
+    log.info(_LOG_STOPPED)
+
+
+class KeepaliveShortcutMiddleware:
+    """最外层中间件：/keepalive 探活请求直接返回 200，不经过路由和其他中间件"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and scope["path"] == "/keepalive" and scope["method"] in ("HEAD", "GET"):
+            await send(_KEEPALIVE_START)
+            await send(_KEEPALIVE_BODY)
+            return
+        await self.app(scope, receive, send)
+
+
+class CachedDocs:
+    """启动时把 docs 目录读入内存（单文件上限 1 MiB），按 ETag 直接返回；未命中时交给 StaticFiles"""
+
+    MAX_FILE_SIZE = 1024 * 1024
+
+    def __init__(self, directory: str):
+        self.fallback = StaticFiles(directory=directory)
+        self.files = {}
+        root = Path(directory)
+        for file in root.rglob("*"):
+            if not file.is_file() or file.stat().st_size > self.MAX_FILE_SIZE:
+                continue
+            data = file.read_bytes()
+            etag = f'"{hashlib.md5(data).hexdigest()}"'.encode()
+            content_type = mimetypes.guess_type(file.name)[0] or "application/octet-stream"
+            if content_type.startswith("text/"):
+                content_type += "; charset=utf-8"
+            headers = [
+                (b"content-type", content_type.encode()),
+                (b"content-length", str(len(data)).encode()),
+                (b"etag", etag),
+            ]
+            self.files["/" + file.relative_to(root).as_posix()] = (data, etag, headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        entry = None
+        if scope["type"] == "http" and scope["method"] in ("GET", "HEAD"):
+            path = scope["path"]
+            root_path = scope.get("root_path", "")
+            if root_path and path.startswith(root_path):
+                path = path[len(root_path):]
+            entry = self.files.get(path)
+        if entry is None:
+            await self.fallback(scope, receive, send)
+            return
+
+        data, etag, headers = entry
+        for name, value in scope["headers"]:
+            if name == b"if-none-match" and etag in value:
+                await send({"type": "http.response.start", "status": 304, "headers": [(b"etag", etag)]})
+                await send({"type": "http.response.body", "body": b""})
+                return
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else data})
 
 
 # 创建FastAPI应用
@@ -98,64 +295,111 @@ app = FastAPI(
     title="GCLI2API",
     description="Gemini API proxy with OpenAI compatibility",
     version="2.0.0",
+    default_response_class=ORJSONResponse,
+    # 不对末尾斜杠做 307 重定向，省去未命中时的第二轮路由匹配
+    redirect_slashes=False,
     lifespan=lifespan,
 )
 
-# CORS中间件
+# 响应压缩（位于 CORS 内层；text/event-stream 流式响应默认不压缩）
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+# CORS中间件：GCLI2API_CORS_ORIGINS 为逗号分隔的来源列表，默认 "*"（不携带凭据）
 app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    PureCORSMiddleware,
+    allow_origins=[o.strip() for o in os.getenv("GCLI2API_CORS_ORIGINS", "*").split(",") if o.strip()] or ["*"],
 )
+# 保活中间件最后添加，位于最外层
+app.add_middleware(KeepaliveShortcutMiddleware)
+
+
+def _mount_routers(app: FastAPI):
+    """导入路由器并合并为一个路由表一次性挂载（热点代理路由 openai / gemini 排在最前面）"""
+    from src.routers.openai import router as openai_router
+    from src.routers.gemini import router as gemini_router
+    from src.routers.dashboard import router as dashboard_router
+    from src.routers.auth import router as auth_router
+    from src.routers.admin import router as admin_router
+    from src.routers.user import router as user_router
+    from src.routers.credentials import router as credentials_router
+
+    combined = APIRouter()
+    combined.include_router(openai_router, tags=["OpenAI Compatible API"])
+    combined.include_router(gemini_router, tags=["Gemini Native API"])
+    combined.include_router(dashboard_router, tags=["Dashboard"])
+    combined.include_router(auth_router, tags=["Authentication"])
+    combined.include_router(admin_router, tags=["Administration"])
+    combined.include_router(user_router, tags=["User Profile"])
+    combined.include_router(credentials_router, tags=["Credentials"])
+    app.include_router(combined)
+
 
 # 挂载路由器
-app.include_router(openai_router, prefix="", tags=["OpenAI Compatible API"])
-app.include_router(gemini_router, prefix="", tags=["Gemini Native API"])
-app.include_router(dashboard_router, prefix="", tags=["Dashboard"])
-app.include_router(auth_router, prefix="", tags=["Authentication"])
-app.include_router(admin_router, prefix="", tags=["Administration"])
-app.include_router(user_router, prefix="", tags=["User Profile"])
-app.include_router(credentials_router, prefix="", tags=["Credentials"])
+_mount_routers(app)
 
 # 静态文件路由
-app.mount("/docs", StaticFiles(directory="docs"), name="docs")
+app.mount("/docs", CachedDocs(directory="docs"), name="docs")
 
 
-# 保活接口
-@app.head("/keepalive")
-async def keepalive() -> Response:
-    return Response(status_code=200)
-
 # 导出给其他模块使用
 __all__ = ["app", "get_credential_manager"]
 
+# 凭证管理器预加载任务（由 main() 在 hypercorn 启动前创建，lifespan 中等待）
+_cm_preload: Optional[asyncio.Task] = None
+
+
+def _kick_preload(loop: asyncio.AbstractEventLoop):
+    """在事件循环上提前启动凭证管理器初始化，与读取配置、绑定端口并行进行"""
+    global _cm_preload
+    if _cm_preload is None:
+        _cm_preload = loop.create_task(get_credential_manager())
+
+
+def _reuseport_bind(host: str, port: int) -> str:
+    """创建带 SO_REUSEPORT 的监听 socket，返回 hypercorn 可用的 fd:// 绑定地址"""
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host.strip("[]"), port))
+    return f"fd://{sock.detach()}"
+
 
 async def main():
     """异步主启动函数"""
     from hypercorn.asyncio import serve
     from hypercorn.config import Config
 
+    # 先完成配置初始化（其中会初始化存储适配器单例），再提前加载凭证；
+    # 否则预加载与 init_config 并发初始化存储适配器，配置会被缓存为空
+    await init_config()
+    # 尽早开始加载凭证，lifespan 启动时直接复用
+    _kick_preload(asyncio.get_running_loop())
+
     # 日志系统现在直接使用环境变量，无需初始化
     # 从环境变量或配置获取端口和主机
     port = await get_server_port()
     host = await get_server_host()
 
-    log.info("=" * 60)
-    log.info("启动 GCLI2API")
-    import os
-    log.info(f"运行目录: {os.getcwd()}")
-    log.info("=" * 60)
-    log.info(f"控制面板: http://127.0.0.1:{port}")
-    log.info("=" * 60)
-    log.info("API端点:")
-    log.info(f"   OpenAI兼容: http://127.0.0.1:{port}/v1")
-    log.info(f"   Gemini原生: http://127.0.0.1:{port}")
+    # 启动横幅合并为一次日志写入
+    banner = [
+        "=" * 60,
+        "启动 GCLI2API",
+        f"运行目录: {os.getcwd()}",
+        "=" * 60,
+        f"控制面板: http://127.0.0.1:{port}",
+        "=" * 60,
+        "API端点:",
+        f"   OpenAI兼容: http://127.0.0.1:{port}/v1",
+        f"   Gemini原生: http://127.0.0.1:{port}",
+    ]
+    log.info("\n" + "\n".join(banner))
 
     # 配置hypercorn
     config = Config()
-    config.bind = [f"{host}:{port}"]
+    # GCLI2API_REUSEPORT=1 时使用 SO_REUSEPORT 监听，可在同一端口启动多个进程，由内核分摊连接
+    if os.getenv("GCLI2API_REUSEPORT", "").lower() in ("1", "true") and hasattr(socket, "SO_REUSEPORT"):
+        config.bind = [_reuseport_bind(host, port)]
+    else:
+        config.bind = [f"{host}:{port}"]
     config.accesslog = "-"
     config.errorlog = "-"
     config.loglevel = "INFO"
@@ -164,16 +408,47 @@ async def main():
     # 设置请求体大小限制为100MB
     config.max_request_body_size = 100 * 1024 * 1024
 
-    # 设置连接超时
-    config.keep_alive_timeout = 300  # 5分钟
+    # 高并发连接：加大监听队列，限制未解析完的请求缓冲
+    config.backlog = int(os.getenv("GCLI2API_BACKLOG", "2048"))
+    config.h11_max_incomplete_size = 16 * 1024
+
+    # 设置连接超时；空闲保活默认与 nginx 一致（65 秒），尽早释放空闲连接
+    config.keep_alive_timeout = int(os.getenv("GCLI2API_KEEPALIVE", "65"))
     config.read_timeout = 300  # 5分钟读取超时
     config.write_timeout = 300  # 5分钟写入超时
 
+    # HTTP/2：配置 TLS 证书后通过 ALPN 协商 h2，多个请求（含 SSE 流）复用同一连接；
+    # 未配置证书时仍为明文 HTTP/1.1，支持 h2c 的客户端可直接使用 HTTP/2
+    config.alpn_protocols = ["h2", "http/1.1"]
+    config.h2_max_concurrent_streams = 100
+    tls_cert = os.getenv("GCLI2API_TLS_CERT")
+    tls_key = os.getenv("GCLI2API_TLS_KEY")
+    if tls_cert and tls_key:
+        config.certfile = tls_cert
+        config.keyfile = tls_key
+
     # 增加启动超时时间以支持大量凭证的场景
     config.startup_timeout = 120  # 2分钟启动超时
 
+    # serve() 只运行单进程；凭证、用户缓存和使用统计都在进程内存中，
+    # 多进程需用 hypercorn 命令行（-w N）或 GCLI2API_REUSEPORT 多开进程，并配合共享存储后端（Redis/Postgres/MongoDB/MySQL）
+    if int(os.getenv("GCLI2API_WORKERS", "1")) > 1:
+        log.warning(
+            "GCLI2API_WORKERS > 1 在 web.py 直接启动时无效，请使用 `hypercorn web:app -w N` "
+            "或设置 GCLI2API_REUSEPORT=1 后启动多个进程，并配置共享存储"
+        )
+
     await serve(app, config)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # 优先使用 uvloop（非 Windows 且已安装时），否则回退到默认事件循环
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())